@@ -1,22 +1,31 @@
 import streamlit as st
-import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+import gzip
 import json
-from io import StringIO
+import threading
+import time
+from io import BytesIO
 # Clean Imports:
+import httplib2
+import google_auth_httplib2
 from googleapiclient.discovery import build 
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload, build_http
 from google.oauth2 import service_account
 
 # -----------------------
 # CONFIG
 # -----------------------
 # --- CRITICAL VARIABLES: UPDATE THESE ---
-# 1. Name of the CSV file in your Google Drive folder
-SHOPPING_FILE_NAME = "shopping_list_data.csv"
-# 2. The ID of the Google Drive folder where the file lives
-# (Get this from the URL of your Drive folder)
-FOLDER_ID = st.secrets["app_config"]["folder_id"]
+# 1. The ID of the gzipped Feather data file (shopping_list_data.feather.gz) in Google Drive
+# (Create the file once, then get this from its sharing URL)
+SHOPPING_FILE_ID = st.secrets["app_config"]["shopping_file_id"]
+# 2. The ID of the change journal (shopping_list_changes.jsonl) in Google Drive
+# (Create it once as an empty file, same as above)
+JOURNAL_FILE_ID = st.secrets["app_config"]["journal_file_id"]
 # 3. The email of the user to impersonate for DWD
 DELEGATED_EMAIL = st.secrets["app_config"]["delegated_email"]
 # ----------------------------------------
@@ -25,6 +34,32 @@ DELEGATED_EMAIL = st.secrets["app_config"]["delegated_email"]
 CATEGORIES = ["Vegetables", "Beverages", "Meat/Dairy", "Frozen", "Dry Goods"]
 STORES = ["Costco", "Trader Joe's", "Whole Foods", "Other"] 
 
+# Edits within this many seconds of the last save are batched into the next one
+SAVE_INTERVAL_SECONDS = 5
+# Rewrite the snapshot (and empty the journal) once the journal holds this many changes
+JOURNAL_COMPACT_SIZE = 50
+
+# Column types for the stored list (written into the Feather file so loads skip inference)
+SCHEMA = pa.schema([
+    ("row_id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    ("item", pa.string()),
+    ("purchased", pa.bool_()),
+    ("category", pa.string()),
+    ("store", pa.string()),
+])
+
+# HTML for one list row: toggle emoji and item name on the left, delete link on the right
+ITEM_ROW_TMPL = (
+    "<div style='display: flex; align-items: center; justify-content: space-between; padding: 8px 5px; margin-bottom: 3px; border-bottom: 1px solid #eee; min-height: 40px;'>"
+    "<div style='display: flex; align-items: center; flex-grow: 1; min-width: 1px;'>"
+    "<a href='?toggle={row_id}' target='_self' style='text-decoration: none; font-size: 18px; flex-shrink: 0; margin-right: 10px; {status_style}'>{status_emoji}</a>"
+    "<span style='font-size: 14px; flex-grow: 1; {status_style}'>{item_name}</span>"
+    "</div>"
+    "<a href='?delete={row_id}' target='_self' style='text-decoration: none; font-size: 18px; flex-shrink: 0; color: #f00;'>🗑️</a>"
+    "</div>"
+)
+
 # -----------------------
 # PAGE SETUP
 # -----------------------
@@ -53,115 +88,302 @@ def get_drive_service():
     # 4. Delegate credentials to impersonate the DELEGATED_EMAIL
     delegated_creds = creds.with_subject(DELEGATED_EMAIL)
     
-    # 5. Build the Drive service client and return it
-    service = build("drive", "v3", credentials=delegated_creds)
+    # 5. Reuse one keep-alive HTTP connection with an on-disk HTTP cache
+    # (build_http keeps the client library's default timeout and 308 handling)
+    http = build_http()
+    http.cache = httplib2.FileCache(".http_cache")
+    http = google_auth_httplib2.AuthorizedHttp(delegated_creds, http=http)
+    
+    # 6. Build the Drive service client and return it
+    service = build("drive", "v3", http=http)
     return service
 
-def find_file_id(service, file_name):
-    """Searches for a file by name within the specified folder ID."""
+def get_file_md5s(service, file_ids):
+    """Fetches only the files' checksums (much cheaper than their content) in one batched request."""
     
-    query = (
-        f"name='{file_name}' and '{FOLDER_ID}' in parents and trashed=false"
-    )
-    response = service.files().list(q=query, fields="files(id)").execute()
-    files = response.get("files", [])
-    return files[0]["id"] if files else None
-
-def load_data_from_drive(service):
-    """Attempts to download the CSV file from Drive."""
+    md5s = {}
+    errors = []
     
-    file_id = find_file_id(service, SHOPPING_FILE_NAME)
+    def collect(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
+        else:
+            md5s[request_id] = response.get("md5Checksum")
     
-    if file_id is None:
-        # File not found, return empty DataFrame AND None for file_id
-        default_cols = ["timestamp", "item", "purchased", "category", "store"]
-        return pd.DataFrame(columns=default_cols), None # <-- ADDED ", None"
+    batch = service.new_batch_http_request(callback=collect)
+    for file_id in file_ids:
+        batch.add(service.files().get(fileId=file_id, fields="md5Checksum"), request_id=file_id)
+    batch.execute()
+    
+    if errors:
+        raise errors[0]
+    return [md5s[file_id] for file_id in file_ids]
 
-    # File found, download its content
+@st.cache_data(max_entries=2)
+def download_file(file_id, md5):
+    """Downloads the raw file bytes from Drive (cached per checksum)."""
+    
+    service = get_drive_service()
     request = service.files().get_media(fileId=file_id)
-    file_content = StringIO()
+    file_content = BytesIO()
     
     downloader = MediaIoBaseDownload(file_content, request)
     done = False
     while not done:
         status, done = downloader.next_chunk()
         
-    file_content.seek(0)
+    return file_content.getvalue()
+
+def load_data_from_drive(md5):
+    """Attempts to download the gzipped Feather file from Drive."""
+    
+    # Download the content of the pinned file (served from cache when possible)
+    file_content = download_file(SHOPPING_FILE_ID, md5)
     
     try:
-        df = pd.read_csv(file_content)
+        # Gunzip unless this is a plain Feather file from before compression was added
+        if file_content[:2] == b"\x1f\x8b":
+            file_content = gzip.decompress(file_content)
+        # One dict per row, keyed by column name
+        items = feather.read_table(BytesIO(file_content)).to_pylist()
     except Exception:
-        # Handle empty/corrupted CSV content
-        default_cols = ["timestamp", "item", "purchased", "category", "store"]
-        df = pd.DataFrame(columns=default_cols)
+        # Handle empty/corrupted file content
+        items = []
         
-    return df, file_id
+    return items
 
-def save_data_to_drive(service, df, file_id=None):
-    """Saves DataFrame as CSV back to Google Drive."""
-    
-    csv_content = df.to_csv(index=False)
-    file_metadata = {"name": SHOPPING_FILE_NAME}
+def upload_file(service, file_id, content, mimetype):
+    """Replaces a pinned Drive file's content and returns its new checksum."""
     
-    # Convert CSV string to bytes for upload
     media_body = MediaIoBaseUpload(
-        StringIO(csv_content),
-        mimetype="text/csv",
-        resumable=True
+        BytesIO(content),
+        mimetype=mimetype,
+        resumable=False
     )
 
-    if file_id:
-        # Update existing file
-        service.files().update(
-            fileId=file_id,
-            media_body=media_body
-        ).execute()
-    else:
-        # Create new file in the specified folder
-        file_metadata["parents"] = [FOLDER_ID]
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media_body,
-            fields="id"
-        ).execute()
-        return file.get("id")
+    # Update the pinned file in place
+    file = service.files().update(
+        fileId=file_id,
+        media_body=media_body,
+        fields="md5Checksum"
+    ).execute()
+    return file.get("md5Checksum")
+
+def save_data_to_drive(service, items):
+    """Saves the item list as gzipped Feather back to Google Drive.
+
+    Returns the new checksum of the file.
+    """
+    
+    # gzip packs the repeated store/category strings far better than Feather's
+    # own per-column compression does at shopping-list sizes
+    buf = BytesIO()
+    feather.write_feather(
+        pa.Table.from_pylist(items, schema=SCHEMA), buf, compression="uncompressed"
+    )
+    return upload_file(
+        service, SHOPPING_FILE_ID, gzip.compress(buf.getvalue()), "application/gzip"
+    )
+
+def load_journal_from_drive(md5):
+    """Downloads the change journal (one JSON change per line) from Drive."""
+    
+    file_content = download_file(JOURNAL_FILE_ID, md5)
+    
+    changes = []
+    for line in file_content.decode("utf-8").splitlines():
+        try:
+            changes.append(json.loads(line))
+        except ValueError:
+            # Skip blank or partially written lines
+            continue
+    return changes
+
+def save_journal_to_drive(service, changes):
+    """Saves the change journal back to Google Drive and returns its checksum."""
+    
+    lines = "".join(json.dumps(change, default=datetime.isoformat) + "\n" for change in changes)
+    return upload_file(service, JOURNAL_FILE_ID, lines.encode("utf-8"), "application/x-ndjson")
 
 # -----------------------
 # DATA LOADING/SAVING WRAPPER
 # -----------------------
 
+@st.cache_resource
+def get_list_store():
+    """Shared copy of the list plus its unsaved-changes state.
+
+    Toggle/delete links reload the page into a new session, so pending edits
+    have to live here rather than in st.session_state.
+    """
+    return {
+        "items": None, "item_set": set(), "by_id": {}, "next_row_id": 0, "journal": [],
+        "md5": None, "journal_md5": None, "dirty": False, "last_save_ts": 0.0,
+        # Sessions run on their own threads; this guards edits and saves
+        "lock": threading.Lock()
+    }
+
+def apply_change(store, change):
+    """Applies one journal change to a list state (the shared store or one being loaded).
+
+    Changes carry absolute values, so replaying one twice is harmless.
+    """
+    
+    if change["op"] == "add":
+        # Copy so later toggles don't rewrite the journaled add
+        row = dict(change["row"])
+        if row["row_id"] in store["by_id"]:
+            return
+        store["items"].append(row)
+        store["by_id"][row["row_id"]] = row
+        store["item_set"].add(row["item"])
+        store["next_row_id"] = max(store["next_row_id"], row["row_id"] + 1)
+    elif change["op"] == "toggle":
+        row = store["by_id"].get(change["row_id"])
+        if row is not None:
+            row["purchased"] = change["purchased"]
+    elif change["op"] == "delete":
+        row = store["by_id"].pop(change["row_id"], None)
+        if row is not None:
+            store["items"].remove(row)
+            store["item_set"].discard(row["item"])
+
 def load_data():
-    """Loads data, ensuring correct types and saving service object."""
+    """Loads data, ensuring all fields exist.
+
+    The list is the Feather snapshot with the change journal replayed on top.
+    It is kept in the shared store so reruns skip the Drive round-trip.
+    Each new session checks both files' checksums once and only re-downloads
+    when they changed outside this app.
+    """
+    
+    store = get_list_store()
+    if store["items"] is not None:
+        # Pending edits are newer than Drive, and one check per session is enough
+        if store["dirty"] or st.session_state.get("md5_checked"):
+            return store["items"]
     
     service = get_drive_service()
-    df, file_id = load_data_from_drive(service)
+    md5, journal_md5 = get_file_md5s(service, [SHOPPING_FILE_ID, JOURNAL_FILE_ID])
+    if store["items"] is not None and (md5, journal_md5) == (store["md5"], store["journal_md5"]):
+        st.session_state["md5_checked"] = True
+        return store["items"]
     
-    # Store service and file_id for saving in the session
-    st.session_state["drive_service"] = service
-    st.session_state["file_id"] = file_id
+    # Build the new state in locals and only publish it once the snapshot and
+    # journal have both loaded, so a failed download can't leave a half-loaded
+    # list behind (whose next save would overwrite the real journal)
+    items = load_data_from_drive(md5)
+    journal = load_journal_from_drive(journal_md5)
     
-    # Ensure all necessary columns exist and are correct type
+    # Ensure all necessary fields exist (types come from the stored file).
+    # Every row shares the file's columns, so checking the first one is enough.
     default_cols = ["timestamp", "item", "purchased", "category", "store"]
-    for col in default_cols:
-        if col not in df.columns:
-            df[col] = False if col == "purchased" else None
-
-    if "purchased" in df.columns:
-        df["purchased"] = df["purchased"].astype(bool)
+    missing = [col for col in default_cols if items and col not in items[0]]
+    if missing:
+        for row in items:
+            for col in missing:
+                row[col] = False if col == "purchased" else None
+    
+    # Stable row ids for the toggle/delete links (older files have none yet)
+    next_row_id = max((row["row_id"] for row in items if row.get("row_id") is not None), default=-1) + 1
+    for row in items:
+        if row.get("row_id") is None:
+            row["row_id"] = next_row_id
+            next_row_id += 1
+    
+    state = {
+        "items": items,
+        # Item names for O(1) duplicate checks when adding
+        "item_set": {row["item"] for row in items},
+        "by_id": {row["row_id"]: row for row in items},
+        # Never lower the high-water mark, so row ids aren't handed out twice
+        "next_row_id": max(next_row_id, store["next_row_id"]),
+    }
+    
+    # Replay the changes made since the snapshot was written
+    for change in journal:
+        if change["op"] == "add" and change["row"].get("timestamp"):
+            change["row"]["timestamp"] = datetime.fromisoformat(change["row"]["timestamp"])
+        apply_change(state, change)
+    
+    with store["lock"]:
+        # Another session may have queued edits while we were downloading
+        if store["dirty"] and store["items"] is not None:
+            return store["items"]
+        store.update(state)
+        store["journal"] = journal
+        store["md5"] = md5
+        store["journal_md5"] = journal_md5
+    st.session_state["md5_checked"] = True
+    return items
+
+def write_pending_changes(store):
+    """Uploads the queued changes; the caller must hold store["lock"].
+
+    Usually only the small journal is uploaded; once it reaches
+    JOURNAL_COMPACT_SIZE changes the snapshot is rewritten and the journal emptied.
+    """
+    
+    service = get_drive_service()
+    
+    # Write the snapshot before emptying the journal, so a failure in between
+    # only leaves changes that replay harmlessly. Only the changes covered by
+    # the snapshot are dropped; anything recorded meanwhile stays queued.
+    compacted = len(store["journal"])
+    if compacted >= JOURNAL_COMPACT_SIZE:
+        store["md5"] = save_data_to_drive(service, store["items"])
+        store["journal"] = store["journal"][compacted:]
+    
+    # Remember our own checksums so the next check doesn't re-download what we wrote
+    uploaded = len(store["journal"])
+    store["journal_md5"] = save_journal_to_drive(service, store["journal"][:uploaded])
+    store["dirty"] = len(store["journal"]) > uploaded
+    store["last_save_ts"] = time.time()
+
+def save_data():
+    """Saves pending changes using cached service, waiting for any save already running."""
+    
+    store = get_list_store()
+    with store["lock"]:
+        write_pending_changes(store)
 
-    return df
+def new_row_id():
+    """Hands out a millisecond-timestamp row id, never lower than any id already seen.
 
-def save_data(df):
-    """Saves data using cached service and file_id."""
+    Ids come from the clock rather than the current maximum, so deleting the
+    newest row (even across a compaction or restart) never frees its id for
+    reuse by a stale toggle/delete link.
+    """
     
-    service = st.session_state["drive_service"]
-    file_id = st.session_state["file_id"]
+    store = get_list_store()
+    with store["lock"]:
+        row_id = max(int(time.time() * 1000), store["next_row_id"])
+        store["next_row_id"] = row_id + 1
+    return row_id
+
+def record_change(change):
+    """Applies a change and queues it for saving instead of uploading right away."""
     
-    new_file_id = save_data_to_drive(service, df, file_id)
+    store = get_list_store()
+    with store["lock"]:
+        apply_change(store, change)
+        store["journal"].append(change)
+        store["dirty"] = True
+
+def flush_pending_saves():
+    """Saves queued edits once SAVE_INTERVAL_SECONDS have passed since the last save.
+
+    Skips the flush if another session is already saving.
+    """
     
-    # Update file_id if a new file was created
-    if new_file_id:
-        st.session_state["file_id"] = new_file_id
+    store = get_list_store()
+    if not store["lock"].acquire(blocking=False):
+        return
+    try:
+        if store["dirty"] and time.time() - store["last_save_ts"] > SAVE_INTERVAL_SECONDS:
+            write_pending_changes(store)
+    finally:
+        store["lock"].release()
 
 
 # -----------------------
@@ -198,139 +420,165 @@ st.markdown(f"<h1>🛒 Shopping List</h1>", unsafe_allow_html=True)
 
 # Load data uses the new Gdrive function
 try:
-    df = load_data() 
+    items = load_data() 
+    flush_pending_saves()
 except Exception as e:
     st.error("Error connecting to Google Drive. Please check your secrets and ensure the Domain-Wide Delegation is configured correctly.")
     st.exception(e)
     st.stop()
 
 
+# ----------------------------------------------------
+# LINK CLICKS (handled before rendering, since they rerun straight away)
+# ----------------------------------------------------
+def handle_link_clicks():
+    """Applies a toggle/delete link click and reruns before the list is rendered."""
+    
+    query_params = st.query_params
+
+    # Check for toggle click
+    toggle_id = query_params.get("toggle", None)
+    if toggle_id and toggle_id.isdigit():
+        clicked_id = int(toggle_id)
+        clicked_row = get_list_store()["by_id"].get(clicked_id)
+        if clicked_row is not None:
+            record_change({"op": "toggle", "row_id": clicked_id, "purchased": not clicked_row["purchased"]}) # SAVED TO GOOGLE DRIVE ON THE NEXT FLUSH
+            st.query_params.clear() 
+            st.rerun()
+
+    # Check for delete click
+    delete_id = query_params.get("delete", None)
+    if delete_id and delete_id.isdigit():
+        clicked_id = int(delete_id)
+        if clicked_id in get_list_store()["by_id"]:
+            record_change({"op": "delete", "row_id": clicked_id}) # SAVED TO GOOGLE DRIVE ON THE NEXT FLUSH
+            st.query_params.clear() 
+            st.rerun()
+
+handle_link_clicks()
+
+
+# ----------------------------------------------------
+# AUTOSAVE (flushes the tail of an edit burst without waiting for another click)
+# ----------------------------------------------------
+@st.fragment(run_every=SAVE_INTERVAL_SECONDS)
+def autosave():
+    """Reruns on a timer so queued edits are saved even if nobody clicks again."""
+    
+    try:
+        flush_pending_saves()
+    except Exception as e:
+        st.error("Error saving to Google Drive. Your changes are kept and will be retried.")
+        st.exception(e)
+
+autosave()
+
+
 # =====================================================
 # ADD ITEM FORM (Outside of tabs so it's always visible)
 # =====================================================
-st.subheader("Add an Item")
-
-# --- Store Selection ---
-new_store = st.selectbox(
-    "Select Store",
-    STORES,
-    index=None,
-    placeholder="Choose a store..."
-)
+@st.fragment
+def render_add_form():
+    """Renders the add form; picking a store or category only reruns this fragment."""
+    
+    st.subheader("Add an Item")
+
+    # --- Store Selection ---
+    new_store = st.selectbox(
+        "Select Store",
+        STORES,
+        index=None,
+        placeholder="Choose a store..."
+    )
 
-# --- Category Selection ---
-new_category = st.selectbox(
-    "Select Category", 
-    CATEGORIES,
-    index=None,
-    placeholder="Choose a category..."
-)
-new_item = st.text_input("Enter the item to purchase", autocomplete="off") 
-
-if st.button("Add Item"):
-    new_item = new_item.strip()
-    
-    if not new_store:
-        st.warning("Please select a store.")
-    elif not new_category:
-        st.warning("Please select a category.")
-    elif not new_item:
-        st.warning("Please enter a valid item name.")
-    elif new_item in df["item"].values:
-        st.warning("That item is already on the list.")
-    else:
-        # Save the new item with both category and store
-        new_row = {
-            "timestamp": datetime.now(), 
-            "item": new_item, 
-            "purchased": False, 
-            "category": new_category,
-            "store": new_store
-        } 
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        save_data(df) # UPDATED TO SAVE VIA GOOGLE DRIVE
-        st.success(f"'{new_item}' added to the list for {new_store} under '{new_category}'.")
-        st.rerun()
+    # --- Category Selection ---
+    new_category = st.selectbox(
+        "Select Category", 
+        CATEGORIES,
+        index=None,
+        placeholder="Choose a category..."
+    )
+    new_item = st.text_input("Enter the item to purchase", autocomplete="off") 
+
+    store = get_list_store()
+    if st.button("Add Item"):
+        new_item = new_item.strip()
+    
+        if not new_store:
+            st.warning("Please select a store.")
+        elif not new_category:
+            st.warning("Please select a category.")
+        elif not new_item:
+            st.warning("Please enter a valid item name.")
+        elif new_item in store["item_set"]:
+            st.warning("That item is already on the list.")
+        else:
+            # Save the new item with both category and store
+            record_change({"op": "add", "row": {
+                "row_id": new_row_id(),
+                "timestamp": datetime.now(), 
+                "item": new_item, 
+                "purchased": False, 
+                "category": new_category,
+                "store": new_store
+            }}) # SAVED TO GOOGLE DRIVE ON THE NEXT FLUSH
+            st.success(f"'{new_item}' added to the list for {new_store} under '{new_category}'.")
+            st.rerun() # Full app rerun so the new item shows up in its tab
+
+render_add_form()
 
 st.markdown("---")
 st.subheader("Items by Store")
 
+# Edits are batched, so offer an immediate save while any are pending
+if get_list_store()["dirty"] and st.button("💾 Save changes"):
+    save_data()
+    st.rerun()
+
 # =====================================================
 # STORE TABS NAVIGATION
 # =====================================================
 
+def render_store(store_rows):
+    """Renders one store's rows, grouped by category, as one Markdown block per category."""
+    
+    # Unique categories in the list
+    for category, group_rows in groupby(store_rows, key=itemgetter("category")):
+        # Uses the margin fix you added earlier
+        st.markdown(f"**<span style='font-size: 20px; color: #1f77b4; margin-bottom: 0px !important;'>{category}</span>**", unsafe_allow_html=True)
+
+        # Collect the rows and send the whole category as one Markdown element
+        html_parts = []
+        for row in group_rows:
+            # Determine the status emoji and style (color only), then fill in the row
+            purchased = row["purchased"]
+            html_parts.append(ITEM_ROW_TMPL.format_map({
+                "row_id": row["row_id"],
+                "item_name": row["item"],
+                "status_emoji": "✅" if purchased else "🛒",
+                "status_style": "color: #888;" if purchased else "color: #000;",
+            }))
+
+        st.markdown("".join(html_parts), unsafe_allow_html=True)
+
 # Create the tabs dynamically
 store_tabs = st.tabs(STORES)
 
+# Sort once by store, category, then purchased status
+sorted_rows = sorted(items, key=itemgetter("store", "category", "purchased"))
+rows_by_store = {
+    store: list(rows) for store, rows in groupby(sorted_rows, key=itemgetter("store"))
+}
+
 # Loop through the store tabs to display the filtered list in each one
 for store_name, store_tab in zip(STORES, store_tabs):
     with store_tab:
         
-        # Filter the main DataFrame for the current store
-        df_store = df[df['store'] == store_name]
+        # Rows for the current store, already sorted by category and purchased status
+        store_rows = rows_by_store.get(store_name)
         
-        if df_store.empty:
+        if not store_rows:
             st.info(f"The list for **{store_name}** is empty. Add items above!")
             continue
-
-        # Group and Sort Items: Group by category, then sort by purchased status within each group
-        df_grouped = df_store.sort_values(by=["category", "purchased"])
         
-        # Unique categories in the list
-        for category, group_df in df_grouped.groupby("category"):
-            # Uses the margin fix you added earlier
-            st.markdown(f"**<span style='font-size: 20px; color: #1f77b4; margin-bottom: 0px !important;'>{category}</span>**", unsafe_allow_html=True)
-                       
-            for idx, row in group_df.iterrows():
-                item_name = row["item"]
-                purchased = row["purchased"]
-
-                # 1. Determine the status emoji and style (color only)
-                status_emoji = "✅" if purchased else "🛒"
-                status_style = "color: #888;" if purchased else "color: #000;"
-                
-                # 2. Link for the status emoji (to toggle purchase)
-                toggle_link = f"<a href='?toggle={idx}' target='_self' style='text-decoration: none; font-size: 18px; flex-shrink: 0; margin-right: 10px; {status_style}'>{status_emoji}</a>"
-                
-                # 3. Link for the delete emoji (to delete the item)
-                delete_link = f"<a href='?delete={idx}' target='_self' style='text-decoration: none; font-size: 18px; flex-shrink: 0; color: #f00;'>🗑️</a>"
-
-                # 4. Item Name display (no link)
-                item_name_display = f"<span style='font-size: 14px; flex-grow: 1; {status_style}'>{item_name}</span>"
-
-                # 5. Assemble the entire row in a single Markdown block using flexbox
-                item_html = f"""
-                <div style='display: flex; align-items: center; justify-content: space-between; padding: 8px 5px; margin-bottom: 3px; border-bottom: 1px solid #eee; min-height: 40px;'>
-                    <div style='display: flex; align-items: center; flex-grow: 1; min-width: 1px;'>
-                        {toggle_link}
-                        {item_name_display}
-                    </div>
-                    {delete_link}
-                </div>
-                """
-                st.markdown(item_html, unsafe_allow_html=True)
-                
-# ----------------------------------------------------
-# FINAL CORE LOGIC BLOCK (MUST be placed at the very end of the script)
-# ----------------------------------------------------
-query_params = st.query_params
-
-# Check for toggle click
-toggle_id = query_params.get("toggle", None)
-if toggle_id and toggle_id.isdigit():
-    clicked_idx = int(toggle_id)
-    if clicked_idx in df.index:
-        df.loc[clicked_idx, "purchased"] = not df.loc[clicked_idx, "purchased"]
-        save_data(df) # SAVING VIA GOOGLE DRIVE
-        st.query_params.clear() 
-        st.rerun()
-
-# Check for delete click
-delete_id = query_params.get("delete", None)
-if delete_id and delete_id.isdigit():
-    clicked_idx = int(delete_id)
-    if clicked_idx in df.index:
-        df = df.drop(clicked_idx)
-        save_data(df) # SAVING VIA GOOGLE DRIVE
-        st.query_params.clear() 
-        st.rerun()
+        render_store(store_rows)